@@ -0,0 +1,62 @@
+"""Startup Time of the Core Package and both Frontends.
+
+Every statement is run in a new python process, so nothing is cached:
+    python3 benchmarks/startup.py [--runs 5] [--create-app]
+--create-app also measures create_app() (downloads the athlete data, if the
+website does not answer within REQUEST_TIMEOUT seconds data.txt is used).
+"""
+
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+# Repository root -> decision_tree can be imported
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATEMENTS = [
+    "import decision_tree",
+    "import decision_tree.data",
+    "import decision_tree.history",
+    "import decision_tree.storage",
+    "import decision_tree.what_if",
+    "import decision_tree.creation",
+    "import decision_tree.loading",
+]
+APP_STATEMENTS = [
+    "from decision_tree.creation import create_app; create_app()",
+    "from decision_tree.loading import create_app; create_app()",
+]
+
+
+def measure(statement):
+    """Seconds a new python process needs to run statement."""
+    code = ("import time; start = time.perf_counter(); " + statement +
+            "; print(time.perf_counter() - start)")
+    result = subprocess.run([sys.executable, "-c", code], cwd=root,
+                            capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--create-app', action='store_true')
+    args = parser.parse_args()
+    statements = STATEMENTS + (APP_STATEMENTS if args.create_app else [])
+    for statement in statements:
+        try:
+            times = [measure(statement) for _ in range(args.runs)]
+        except subprocess.CalledProcessError as error:
+            # bsp: dash is not installed
+            print(f"{statement:<62} failed: "
+                  f"{error.stderr.strip().splitlines()[-1]}")
+            continue
+        print(f"{statement:<62} min {min(times) * 1000:8.1f} ms  "
+              f"median {statistics.median(times) * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,7 @@
+"""Decision Tree Builder for Athlete Data.
+
+Shared core of both frontends: athlete data (data), tree versions
+(history), what-if sweeps (what_if) and tree storage (storage). The
+frontends are created by decision_tree.creation.create_app and
+decision_tree.loading.create_app.
+"""
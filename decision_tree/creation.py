@@ -0,0 +1,564 @@
+"""Decision Tree Creation Frontend for Athlete Date.
+
+The app is created by create_app(). Importing this module does not load
+any data or connect to the database.
+"""
+
+
+import json
+from dash import Dash, dash_table, dcc, html, Output, Input, State, \
+    callback_context, no_update, Patch
+import dash_cytoscape as cyto
+from decision_tree import storage
+from decision_tree.data import get_athlete_data
+from decision_tree.history import TreeHistory
+from decision_tree.layout import network_stylesheet, table_style_header, \
+    table_style_data
+from decision_tree.sessions import Sessions
+
+# The testIDs at the start (set by create_app). One button (+ callback
+# input) is created for each
+test_ids = []
+# Message if the server does not know the session of the page (bsp: after a
+# restart of the server)
+SESSION_EXPIRED = "SESSION EXPIRED, PLEASE RELOAD THE PAGE"
+
+
+class CreationSession:
+    """Tree that is created in one page (browser tab).
+
+    The node labels (athletes of a node) are calculated from the table of
+    the snapshot. The whole tree of a session uses the snapshot of the page
+    load, so every label matches the edge conditions above it even if the
+    data is refreshed in the meantime. New data is used after a reload of
+    the page.
+
+    """
+    __slots__ = ('snapshot', 'counter', 'recommendations', 'history')
+
+    def __init__(self, snapshot):
+        # Athlete data of the tree (see data.Snapshot)
+        self.snapshot = snapshot
+        # Tracking the node number
+        self.counter = 0
+        # leaf node id -> recommendation
+        self.recommendations = {}
+        # All versions of the tree (undo/redo and named branches)
+        # At the beginning the root node contains all athletes
+        self.history = TreeHistory(
+            str(snapshot.table['athID'].to_list()))
+
+
+# session id -> CreationSession
+sessions = Sessions()
+
+
+# Define style for testID buttons
+def testID_buttons_style():
+    return {
+        'font-size': 20,
+        'width': '50px',
+        'height': '50px',
+        'margin': '12px',
+        "padding": "13px",
+        'border-radius': "50%",
+        'background-color': 'orange'
+    }
+
+
+def serve_layout():
+    """Layout of the app. Is created every time the page is loaded, so the
+    page always shows the newest athlete data.
+    Every page gets a new session, so the tree starts again with the root
+    node and other tabs keep their trees."""
+    session = CreationSession(get_athlete_data().snapshot)
+    session_id = sessions.new(session)
+    # The table of the page is the table the tree is created from
+    table = session.snapshot.table
+    # At the beginning there is only root node (label contains all athletes)
+    # = [{'data': {'id': 'everybody', 'label': '[1000, 1027, ...]'}}]
+    nodes = session.history.elements()
+    edges = []
+    return html.Div([
+
+        html.H1("Decision Tree Creation Athletes"),
+
+        # id of the session -> every callback gets the tree of this page
+        dcc.Store(id='session-id', data=session_id),
+
+        dash_table.DataTable(
+            # Expects list of dicts.
+            # From each row of my PivotTable (i.e. each athlete) a separate
+            # dictionary is created with the testIDs as keys
+            data=table.to_dict('records'),
+            # The i in the columns (testID) is used both as column header and
+            # id
+            columns=[{'name': i, 'id': i} for i in table.columns],
+            page_size=5,
+            id='data',
+            style_header=table_style_header,
+            style_data=table_style_data,
+        ),
+
+        # Div contains Threshold-Menu, Note-selection-Menu, Node-Buttons on the
+        # left side, Recommendations in the middle and save-tree button on the
+        # right
+        html.Div([
+            # Store Threshold-Menu, Note-Dropdown-Menu, Node-Buttons
+            html.Div
+                (children=[
+
+                # User input Threshold
+                html.Label("Threshold: "),
+                dcc.Input(id='threshold', type='number', min=1, max=10,
+                          value=5),
+
+                html.Br(),
+                html.Br(),
+
+                html.Label("Please select a node: "),
+                # Node-Dropdown menu
+                # takes options (a list with all elements the menu contains)
+                # and value (displayed (default) element) as input
+                html.Div(
+                    children=[dcc.Dropdown(id="nodes-dropdown",
+                                           options=['everybody'],
+                                           value='everybody',
+                                           clearable=False)],
+                    style={'width': 400}),
+
+                # Creates buttons for each column index (testID) of the table
+                # Omit the column with athleteID
+                # The id of each button is: "str(i)" !
+                html.Div(
+                    children=[
+                        html.Button(style=testID_buttons_style(),
+                                    children=f"{i}", id=str(i)) for i in
+                        test_ids], style={'align-items': 'center'}
+                ),
+
+                html.Br(),
+
+                # instructions
+                html.Div("1. Enter a valid Threshold"),
+                html.Br(),
+                html.Div("2. Select a node"),
+                html.Br(),
+                html.Div("3. Choose a Test ID"),
+
+            ],
+                style={'width': '45%', 'display': 'inline-block'}),
+
+            # Write/store Recommendations
+            html.Div(children=[
+
+                html.Button('Save Recommendations', id='save-recommendation'),
+
+                html.Br(),
+
+                dcc.Textarea(
+                    id='recommendation',
+                    value='',
+                    style={'width': 400, 'height': 100},
+                ),
+
+                # Show when recommendation is saved
+                html.Div(id='text-saved', children=""),
+                html.Br(),
+                html.Br(),
+
+                # If there are problems updating the elements (tree),
+                # the error is displayed here
+                html.Div(id='network-issues', children=""),
+                html.Br(),
+
+                # Undo/Redo the last split
+                html.Button('Undo', id='undo'),
+                html.Button('Redo', id='redo'),
+                html.Br(),
+                html.Br(),
+
+                # Store the current tree as a named branch to try alternatives
+                dcc.Input(id='branch-name', type="text"),
+                html.Button('Save Branch', id='save-branch'),
+                # Select a branch -> the branch becomes the current tree
+                html.Div(
+                    children=[dcc.Dropdown(id="branch-dropdown", options=[])],
+                    style={'width': 400}),
+                html.Button('Compare Branch', id='compare-branch'),
+                # Show the splits that differ from the selected branch
+                html.Div(id='branch-info', children=""),
+
+            ],
+
+                style={'width': '30%', 'display': 'inline-block',
+                       'vertical-align': 'top'}),
+
+            # Save the tree in a postgres table
+            html.Div(children=[
+
+                html.Button('Save Tree', id='save-tree'),
+                html.Br(),
+                dcc.Input(
+                    id='tree-id',
+                    type="text"
+                ),
+                # Show when tree is stored or if id already exists
+                html.Div(id='stored', children="")
+
+            ],
+
+                style={'width': '25%', 'display': 'inline-block',
+                       'float': 'right'}),
+
+        ]),
+
+        # Display the node description that was selected
+        html.Div(id='node-description-output'),
+
+        html.Br(),
+
+        # Network
+        cyto.Cytoscape(
+            id='network',
+            # Node format: {'data': {'id': 'Node_id', 'label': 'node_label'}
+            # Edge format: {'data': {'source': 'start node',
+            # 'target': 'end node',
+            # 'label': 'edge_label'}}
+            # At beginning:
+            # nodes = [{'data': {'id': 'everybody',
+            #                    'label': '[1000, 1027, ...]'}}]
+            #       only root node
+            # edges = []
+            elements=edges + nodes,
+            style={'width': '100%', 'height': '500px'},
+            layout={'name': 'dagre', 'animate': True},  # 'locked'=True
+            stylesheet=network_stylesheet
+        )])
+
+
+def update_elements(*args):
+    """Functions updates the nodes + edges and the leaf nodes in the
+    nodes-dropdown-menu.
+    Called when one of the testID buttons, Undo, Redo or Save Branch is
+    pressed or a branch is selected.
+    Input:
+        The (testID) Buttons, the Undo/Redo/Save Branch Buttons and the
+        branch dropdown menu,
+        The threshold value, the leaf node on which the threshold is applied
+        (nodes-dropdown value), the name of the new branch and the session id.
+    args is used so the number of testIDs is flexible.
+    The tree itself is stored in the history of the session (on the server).
+    Every change creates a new version of the tree (see history.py), so it
+    can be undone.
+    Only the changes are sent to the network and the dropdown menu (Patch),
+    so the size of the response does not grow with the tree. Only switching
+    to a branch sends the whole tree.
+
+    """
+    session = sessions.get(args[len(test_ids) + 7])
+    if session is None:
+        return no_update, SESSION_EXPIRED, no_update, no_update, no_update
+    history = session.history
+    # Get the id of the pressed button (testID, undo, redo, ...)
+    cur_testID = callback_context.triggered[0]["prop_id"].split(".")[0]
+    # The table of the session -> all nodes of the tree are calculated from
+    # the same data, even if the data is refreshed in the meantime
+    table = session.snapshot.table
+    # buttons (so all testIDs) + undo, redo, save-branch, branch-dropdown are
+    # part of the input so the threshold is at index len(test_ids) + 4
+    threshold = args[len(test_ids) + 4]
+    # leaf_node is the node to which the threshold is applied.
+    # It is the node selected in the dropdown menu
+    leaf_node = str(args[len(test_ids) + 5])
+    # Per default nothing is changed
+    elements = no_update
+    branches = no_update
+    leaves = no_update
+    value = no_update
+    message = ""
+    if cur_testID == "undo":
+        version = history.current
+        if history.undo():
+            # remove the nodes + edges of the last split
+            elements = Patch()
+            leaves = Patch()
+            for element in history.split_elements(version):
+                elements.remove(element)
+                if 'id' in element['data']:
+                    leaves.remove(element['data']['id'])
+            # the split node is a leaf again
+            leaves.append(version.split)
+            value = version.split
+        else:
+            message = "NOTHING TO UNDO"
+    elif cur_testID == "redo":
+        if history.redo():
+            elements, leaves, value = split_patches(history)
+        else:
+            message = "NOTHING TO REDO"
+    elif cur_testID == "save-branch":
+        branch = args[len(test_ids) + 6]
+        if branch:
+            history.save_branch(branch)
+            branches = list(history.branches)
+        else:
+            message = "PLEASE ENTER A BRANCH NAME"
+    elif cur_testID == "branch-dropdown":
+        branch = args[len(test_ids) + 3]
+        if branch in history.branches:
+            history.switch_branch(branch)
+            # the whole tree can be different -> send all elements
+            elements = history.elements()
+            leaves = history.leaves()
+            value = leaves[0]
+    # If no or no valid threshold is selected. For numbers outside the
+    # limits (1,10) the threshold value is automatically None
+    elif threshold is None:
+        message = "PLEASE SELECT A VALID THRESHOLD FROM 1 TO 10"
+    elif cur_testID != '':
+        # At the label position of each node I always store all contained
+        # athletes. Now I want to get all athlete that my leaf_node contains
+        leaf = history.find(leaf_node)
+        # the node was split already (bsp: in another tab) or does not exist
+        # in the current version
+        if leaf is None or leaf.children:
+            message = "NODE IS NO LEAF"
+        # when there are no athletes then it does not go further
+        elif len(leaf.label) <= 2:
+            message = "NODE CONTAINS NO ATHLETES"
+        else:
+            # Select only the athletes the leaf node contains in the table
+            df_ath = table.loc[json.loads(leaf.label)]
+            # Only the relevant TestID
+            df_ath = (df_ath[cur_testID])
+            # Get and add the new nodes and edges
+            nodes1, edges1 = data_split(df_ath, cur_testID, threshold,
+                                        leaf_node, session.counter + 1)
+            if history.split(leaf_node, *((node['data']['id'],
+                                           node['data']['label'],
+                                           edge['data']['label']) for
+                                          node, edge in zip(nodes1, edges1))):
+                session.counter += 1
+                elements, leaves, value = split_patches(history)
+            else:
+                message = "NODE IS NO LEAF"
+    # Return the changes to the network, the branch menu and the
+    # nodes-dropdown-menu and the error message
+    return elements, message, branches, leaves, value
+
+
+def split_patches(history):
+    """Patches that add the last split of the current tree version to the
+    network elements and to the leaf nodes in the nodes-dropdown-menu.
+    The split node is no leaf anymore, its two new children are. The left
+    child is selected in the dropdown menu.
+
+    """
+    elements = Patch()
+    leaves = Patch()
+    new_elements = history.split_elements()
+    elements.extend(new_elements)
+    leaves.remove(history.current.split)
+    # new_elements = [left node, right node, left edge, right edge]
+    for node in new_elements[:2]:
+        leaves.append(node['data']['id'])
+    return elements, leaves, new_elements[0]['data']['id']
+
+
+def data_split(df_ath, testID, threshold, leaf_node, cur_counter):
+    """Function splits the athletes in two nodes"""
+    # Create two tables for the correct athletes.
+    athl_left = df_ath[df_ath <= threshold]
+    athl_right = df_ath[df_ath > threshold]
+    """
+    remember:
+    node = {'data': {'id': 'one', 'label': 'Node 1'}}
+    edge =  {'data': {'source': 'one', 'target': 'two', 'label': 'Node 1'}}] 
+    """
+
+    # Create 2 new nodes. id of the left one is "node{cur_counter}-l" and of
+    # the right one "node{cur_counter}-r". In the label the respective
+    # athletes which the node contains are written
+    nodes = [{'data': {'id': my_id, 'label': my_label}} for my_id, my_label in
+             ((f"node{cur_counter}-l", str(athl_left.index.tolist())),
+              (f"node{cur_counter}-r", str(athl_right.index.tolist())))]
+
+    # Create 2 new edges from the leaf_node (source) to the two new nodes.
+    # As label of the edge the applied threshold is stored.
+    # To the left node this is: "{testID}<={threshold}".
+    # Remember: The Threshold label is displayed in the network Stylesheet as
+    # Edge label
+    edges = [{'data': {'source': source, 'target': target, 'label': label}} for
+             source, target, label in
+             ((leaf_node, f"node{cur_counter}-l", f"{testID}<={threshold}"),
+              (leaf_node, f"node{cur_counter}-r", f"{testID}>{threshold}"))]
+    return nodes, edges
+
+
+def compare_branch(num_clicks, branch, session_id):
+    """Show the differences between the current tree and a branch.
+    Called when Compare Branch is clicked. Shows the rules (thresholds from
+    the root to a node) that only one of the two trees contains.
+
+    """
+    session = sessions.get(session_id)
+    if session is None:
+        return SESSION_EXPIRED
+    history = session.history
+    if branch not in history.branches:
+        return "Please select a branch"
+    only_current, only_branch = history.compare(branch)
+    return "Only in current tree: " + str(only_current) + \
+           " Only in " + branch + ": " + str(only_branch)
+
+
+def displayTapNodeData(data):
+    """Shows All Athletes of the network node.
+    When a node in the network is pressed, displayTapNodeData  and all athletes
+    of the node are displayed in the node-description-output element.
+
+    """
+    if data:
+        # data['label'] stores all athletes of this node
+        return "Node description of " + data['id'] + ": " + data['label']
+
+
+def update_recommendation(num_clicks, cur_rec, tree_id, session_id):
+    """Store text of selected leaf node.
+    Is called when save-text is clicked.
+    Takes the current state of the text and the current node in the dropdown
+    menu as input.
+    Stores the text for current leaf-node in the dropdown menu.
+    Caution. The text applies to the node that is currently selected in the
+    dropdown menu and not the node for which is currently displayed in the
+    node description. Since only the leaves are displayed in the dropdown menu,
+    the recommendation can only be stored/displayed for them.
+
+    """
+    session = sessions.get(session_id)
+    if session is None:
+        return SESSION_EXPIRED
+    # If a node in the dropdown menu is selected
+    if tree_id is not None:
+        # Store the text for the node in the dictionary
+        session.recommendations[tree_id] = cur_rec
+        # Show the user for which node the recommendation is saved
+        return tree_id + " stored"
+    # Callback function has to have a return. Return "" if not recommendation
+    # is saved
+    return ''
+
+
+def load_recommendation(tree_id, session_id):
+    """Show recommendation of selected node in dropdown menu"""
+    session = sessions.get(session_id)
+    if session is None:
+        return '', SESSION_EXPIRED
+    try:
+        text = session.recommendations[tree_id]
+    except:
+        text = ''
+    # return recommendation of node
+    # per default no text is shown in the text-saved field. Only if a new
+    # recommendation is stored it is shown there
+    return text, ""
+
+
+def store_results(num_clicks, tree_id, session_id):
+    """Stores the trees (nodes + edges) + recommendations in the database.
+    The current version of the tree is taken from the history of the
+    session. Only the recommendations of nodes that are in this version are
+    stored (not the ones of undone splits or of other branches)."""
+    session = sessions.get(session_id)
+    if session is None:
+        return SESSION_EXPIRED
+    history = session.history
+    elements = history.elements()
+    cur_recommendations = {node_id: text for node_id, text in
+                           session.recommendations.items() if
+                           history.find(node_id) is not None}
+    # If an id is entered
+    if tree_id is not None:
+        try:
+            # Store treeID, elements, recommendations in table "store"
+            # Tree ID is stored in first col: tree_id (character)
+            # Elements are stored in second col: elements (json)
+            # Recommendations are stored in third col: recommendations (json)
+            storage.store_tree(storage.get_connection(), tree_id, elements,
+                               cur_recommendations)
+        except:
+            return "ID exists already"
+        # Show user that tree is saved
+        return tree_id + " stored"
+
+    else:
+        return 'Please enter an id'
+
+
+def create_app():
+    """Create the app.
+    Loads the athlete data (if it is not loaded yet) and registers the
+    callbacks. The callbacks need the testIDs, so this can not happen when
+    the module is imported.
+
+    """
+    global test_ids
+    # Required for the hierarchical network
+    cyto.load_extra_layouts()
+    # athlete_data.snapshot.table contains the testIDs as columns + an
+    # additional column with the athleteID (athID) and one row per athlete.
+    table = get_athlete_data().snapshot.table
+    test_ids = [i for i in table.columns if i != 'athID']
+
+    # Initialize the app
+    # compress -> responses are sent gzip compressed
+    app = Dash(__name__, title="Decision Tree Creation Athletes",
+               prevent_initial_callbacks=True,
+               suppress_callback_exceptions=True, compress=True)
+    app.layout = serve_layout
+
+    app.callback(Output('network', 'elements'),
+                 Output('network-issues', 'children'),
+                 Output('branch-dropdown', 'options'),
+                 Output("nodes-dropdown", "options"),
+                 Output("nodes-dropdown", "value"),
+                 # str(i) is the button id
+                 [Input(str(i), "n_clicks") for i in test_ids],
+                 Input('undo', 'n_clicks'),
+                 Input('redo', 'n_clicks'),
+                 Input('save-branch', 'n_clicks'),
+                 Input('branch-dropdown', 'value'),
+                 State('threshold', 'value'),
+                 State("nodes-dropdown", "value"),
+                 State('branch-name', 'value'),
+                 State('session-id', 'data'))(update_elements)
+
+    app.callback(Output('branch-info', 'children'),
+                 Input('compare-branch', 'n_clicks'),
+                 State('branch-dropdown', 'value'),
+                 State('session-id', 'data'))(compare_branch)
+
+    app.callback(Output('node-description-output', 'children'),
+                 Input('network', 'tapNodeData'))(displayTapNodeData)
+
+    # allow_duplicate -> multiple callback functions address the same div.
+    app.callback(Output('text-saved', 'children', allow_duplicate=True),
+                 Input('save-recommendation', 'n_clicks'),
+                 State('recommendation', 'value'),
+                 State("nodes-dropdown", "value"),
+                 State('session-id', 'data'),
+                 prevent_initial_call=True)(update_recommendation)
+
+    app.callback(Output("recommendation", "value"),
+                 Output("text-saved", "children", allow_duplicate=True),
+                 Input("nodes-dropdown", "value"),
+                 State('session-id', 'data'),
+                 prevent_initial_call=True)(load_recommendation)
+
+    app.callback(Output('stored', 'children'),
+                 Input('save-tree', 'n_clicks'),
+                 State('tree-id', 'value'),
+                 State('session-id', 'data'))(store_results)
+    return app
+
@@ -0,0 +1,211 @@
+"""Athlete Data Loading and Background Refresh."""
+
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+url = 'https://inprove-sport.info/csv/getInproveDemo/hgnxjgTyrkCvdR'
+# Text file with the data that is used if there is no internet connection
+data_file = os.path.join(os.path.dirname(os.path.dirname(__file__)),
+                         'data.txt')
+# Seconds between two refreshes of the athlete data
+REFRESH_INTERVAL = 300
+# Seconds to wait for the website before the download is given up
+REQUEST_TIMEOUT = 10
+
+
+def download_records(fallback=True):
+    """Download all test records from the website.
+    Record format: {"athleteID": 2991, "testID": 711, "testValue": 6,
+                    "date": "2022-05-09"}
+    If the download is not possible the existing text file is used
+    (fallback=True) or None is returned (fallback=False).
+
+    """
+    # requests is only imported when the data is downloaded
+    import requests
+    try:
+        response = requests.get(url, timeout=REQUEST_TIMEOUT)
+        data_raw = response.json()
+    except Exception:
+        if not fallback:
+            logger.warning("Download of the athlete data failed",
+                           exc_info=True)
+            return None
+        # Not possible to download data -> use existing text file
+        with open(data_file, 'r') as f:
+            data_raw = json.loads(f.read())
+    return data_raw['res']
+
+
+def valid_record(record):
+    """True if the record has an athleteID, testID, date and a numeric
+    testValue. Other records can not be used for the table."""
+    try:
+        value = record['testValue']
+        return (record['athleteID'] is not None and
+                record['testID'] is not None and
+                record['date'] is not None and
+                isinstance(value, (int, float)) and
+                not isinstance(value, bool) and not math.isnan(value))
+    except (KeyError, TypeError):
+        return False
+
+
+class Snapshot:
+    """One version of the athlete table.
+
+    A snapshot is never changed after it is created. A callback that reads
+    athlete_data.snapshot once always works on a consistent table, even if a
+    refresh swaps in a new snapshot in the meantime.
+    changed contains the athleteIDs and changed_tests the testIDs whose
+    values differ from the previous snapshot (all of them for the first
+    snapshot).
+
+    """
+    __slots__ = ('table', 'version', 'changed', 'changed_tests')
+
+    def __init__(self, table, version, changed, changed_tests):
+        self.table = table
+        self.version = version
+        self.changed = changed
+        self.changed_tests = changed_tests
+
+
+class AthleteData:
+    """Athlete table (athleteID x testID) that can be refreshed.
+
+    All records are stored by (athleteID, testID, date). A refresh only
+    merges the records that are new or changed (the delta) and only
+    recalculates the table cells of these records. The new table is then
+    swapped in as a new Snapshot.
+
+    """
+
+    def __init__(self, records):
+        # pandas is only imported when the table is created
+        import pandas as pd
+        records = [record for record in records if valid_record(record)]
+        # (athleteID, testID) -> {date: testValue}
+        self.values = {}
+        for record in records:
+            self.values.setdefault(
+                (record['athleteID'], str(record['testID'])), {})[
+                record['date']] = record['testValue']
+        # Load data into a DataFrame
+        data = pd.json_normalize(records)
+        data['testID'] = data['testID'].astype(str)
+        table = data.pivot_table(index="athleteID", columns="testID",
+                                 values="testValue")
+        # Create an additional column with the athleteID (the index of the
+        # table row) -> columns now contain all testIDs and the AthleteID
+        table["athID"] = table.index
+        self.snapshot = Snapshot(table, 0, set(table.index),
+                                 set(table.columns.drop('athID')))
+        # functions that are called with the new snapshot after every swap
+        self.listeners = []
+        # only one refresh at a time
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def subscribe(self, listener):
+        """Call listener(snapshot) every time a new snapshot is swapped in.
+        Used to invalidate data that is derived from the table."""
+        self.listeners.append(listener)
+
+    def merge(self, records):
+        """Merge the records into the table.
+        Returns the new snapshot or None if nothing changed.
+
+        """
+        with self.lock:
+            # cells (athleteID, testID) that contain a new or changed value
+            # -> all dates of the cell. self.values is only updated after the
+            # new table was created, so a failed merge changes nothing.
+            cells = {}
+            skipped = 0
+            for record in records:
+                if not valid_record(record):
+                    skipped += 1
+                    continue
+                cell = (record['athleteID'], str(record['testID']))
+                dates = cells.get(cell, self.values.get(cell, {}))
+                if dates.get(record['date']) != record['testValue']:
+                    dates = dict(dates)
+                    dates[record['date']] = record['testValue']
+                    cells[cell] = dates
+            if skipped:
+                logger.warning("%d invalid athlete records skipped", skipped)
+            if not cells:
+                return None
+            old = self.snapshot.table
+            athletes = {athlete for athlete, _ in cells}
+            test_ids = {test_id for _, test_id in cells}
+            # New athletes and tests get a new row/column
+            table = old.reindex(
+                index=old.index.union(sorted(athletes)),
+                columns=old.columns.drop('athID').union(sorted(test_ids)))
+            # Only the changed cells are calculated again
+            # (mean of all dates like in the pivot table)
+            for (athlete, test_id), dates in cells.items():
+                table.at[athlete, test_id] = \
+                    sum(dates.values()) / len(dates)
+            table["athID"] = table.index
+            snapshot = Snapshot(table, self.snapshot.version + 1, athletes,
+                                test_ids)
+            self.values.update(cells)
+            # Swap in the new table. Assigning an attribute is atomic, so
+            # callbacks either see the old or the new snapshot
+            self.snapshot = snapshot
+        # the snapshot of this merge, self.snapshot can be newer already
+        for listener in self.listeners:
+            listener(snapshot)
+        return snapshot
+
+    def refresh(self):
+        """Download the records and merge them into the table."""
+        records = download_records(fallback=False)
+        if records is not None:
+            return self.merge(records)
+        return None
+
+    def start(self, interval=REFRESH_INTERVAL):
+        """Refresh the data every interval seconds in a background thread."""
+        if self.thread is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.refresh()
+                except Exception:
+                    # keep the old snapshot if the new data is broken
+                    logger.exception("Refresh of the athlete data failed")
+
+        # daemon -> the thread stops when the app stops
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+
+
+# Athlete data of the running app (see get_athlete_data)
+athlete_data = None
+
+
+def get_athlete_data():
+    """Return the athlete data of the app.
+    The data is downloaded the first time it is needed and then refreshed in
+    the background. Importing this module does not download anything.
+
+    """
+    global athlete_data
+    if athlete_data is None:
+        athlete_data = AthleteData(download_records())
+        athlete_data.start()
+    return athlete_data
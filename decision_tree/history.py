@@ -0,0 +1,198 @@
+"""Persistent Tree History for the Decision Tree Creation Frontend."""
+
+
+class TreeNode:
+    """Immutable node of a decision tree.
+
+    id and label are the same as in the network node
+    ({'data': {'id': id, 'label': label}}). children is a tuple of
+    (edge_label, TreeNode) pairs, the first pair is the "<=" branch and the
+    second one the ">" branch. A node is never changed after it is created,
+    so all versions of the tree can share the nodes they have in common.
+
+    """
+    __slots__ = ('id', 'label', 'children')
+
+    def __init__(self, node_id, label, children=()):
+        self.id = node_id
+        self.label = label
+        self.children = children
+
+
+class TreeVersion:
+    """One version (state) of the tree.
+
+    parent is the version this version was created from (None for the root
+    version). Going back to the parent is an undo.
+    split is the id of the leaf that was split to create this version.
+
+    """
+    __slots__ = ('root', 'parent', 'split')
+
+    def __init__(self, root, parent=None, split=None):
+        self.root = root
+        self.parent = parent
+        self.split = split
+
+
+class TreeHistory:
+    """Undo/redo and named branches for the tree that is created.
+
+    Every split creates a new TreeVersion. Only the nodes on the path from
+    the root to the split leaf are copied (path copying), all other nodes are
+    shared with the previous version -> O(depth) memory per split.
+    Undo/Redo only move the current version -> O(1).
+    Branches are names for versions, so switching between alternatives
+    costs nothing.
+
+    """
+
+    def __init__(self, root_label):
+        # At the beginning there is only the root node
+        self.current = TreeVersion(TreeNode('everybody', root_label))
+        # versions that can be restored with redo (last element = next redo)
+        self.redo_stack = []
+        # branch name -> TreeVersion
+        self.branches = {}
+        # node id -> child positions from the root to the node.
+        # Node ids are never reused, so the path of an id never changes and
+        # this dict can be shared by all versions.
+        # bsp: paths['node2-r'] = (0, 1) -> first child of everybody,
+        # then second child
+        self.paths = {'everybody': ()}
+
+    def split(self, leaf_id, left, right):
+        """Add the two children (left, right) to the leaf leaf_id.
+
+        left and right are (node_id, label, edge_label) tuples.
+        Creates and returns the new current version.
+        Returns None if leaf_id is not a leaf of the current version.
+
+        """
+        leaf = self.find(leaf_id)
+        if leaf is None or leaf.children:
+            return None
+        path = self.paths[leaf_id]
+        children = tuple((edge_label, TreeNode(node_id, label)) for
+                         node_id, label, edge_label in (left, right))
+        new_root = self._copy_path(self.current.root, path,
+                                   TreeNode(leaf.id, leaf.label, children))
+        for i, (node_id, _, _) in enumerate((left, right)):
+            self.paths[node_id] = path + (i,)
+        self.current = TreeVersion(new_root, self.current, leaf_id)
+        # a new split makes the redo versions unreachable
+        self.redo_stack = []
+        return self.current
+
+    def undo(self):
+        """Go back to the previous version. Returns False if not possible."""
+        if self.current.parent is None:
+            return False
+        self.redo_stack.append(self.current)
+        self.current = self.current.parent
+        return True
+
+    def redo(self):
+        """Restore the last undone version. Returns False if not possible."""
+        if not self.redo_stack:
+            return False
+        self.current = self.redo_stack.pop()
+        return True
+
+    def save_branch(self, name):
+        """Store the current version under name (overwrites the old one)."""
+        self.branches[name] = self.current
+
+    def switch_branch(self, name):
+        """Make the version stored under name the current version."""
+        self.current = self.branches[name]
+        self.redo_stack = []
+
+    def leaves(self, version=None):
+        """Ids of all leaf nodes of a version (default: current version)."""
+        version = self.current if version is None else version
+        return [node.id for node in self._iter_nodes(version.root) if
+                not node.children]
+
+    def compare(self, name):
+        """Compare the current version with the branch name.
+
+        Returns two lists with the rules (bsp: '715<=5 -> 712>3') that
+        are only in the current version and only in the branch. Rules are
+        compared by their thresholds and not by the node ids, because the
+        node ids of two branches are always different.
+
+        """
+        current = self._splits(self.current.root)
+        other = self._splits(self.branches[name].root)
+        return sorted(current - other), sorted(other - current)
+
+    def elements(self, version=None):
+        """Network elements (nodes + edges) of a version."""
+        version = self.current if version is None else version
+        nodes = []
+        edges = []
+        for node in self._iter_nodes(version.root):
+            nodes.append({'data': {'id': node.id, 'label': node.label}})
+            for edge_label, child in node.children:
+                edges.append({'data': {'source': node.id, 'target': child.id,
+                                       'label': edge_label}})
+        return nodes + edges
+
+    def split_elements(self, version=None):
+        """Network elements (2 nodes + 2 edges) that were added by the split
+        that created a version (default: current version).
+        Used to send only the changes to the network."""
+        version = self.current if version is None else version
+        node = self.find(version.split, version)
+        nodes = [{'data': {'id': child.id, 'label': child.label}} for _, child
+                 in node.children]
+        edges = [{'data': {'source': node.id, 'target': child.id,
+                           'label': edge_label}} for edge_label, child in
+                 node.children]
+        return nodes + edges
+
+    def find(self, node_id, version=None):
+        """Node node_id of a version (default: current version).
+        Only the path to the node is visited -> O(depth).
+        Returns None if the version does not contain the node."""
+        version = self.current if version is None else version
+        node = version.root
+        for i in self.paths.get(node_id, [None]):
+            if i is None or i >= len(node.children):
+                return None
+            node = node.children[i][1]
+        return node if node.id == node_id else None
+
+    @classmethod
+    def _copy_path(cls, node, path, new_leaf):
+        """Return a copy of node in which the node at path is new_leaf.
+        Only the nodes on the path are copied."""
+        if not path:
+            return new_leaf
+        children = list(node.children)
+        edge_label, child = children[path[0]]
+        children[path[0]] = (edge_label,
+                             cls._copy_path(child, path[1:], new_leaf))
+        return TreeNode(node.id, node.label, tuple(children))
+
+    @staticmethod
+    def _iter_nodes(root):
+        """All nodes of the tree (parents before their children)."""
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            yield node
+            # reversed -> the left child is returned before the right one
+            stack.extend(child for _, child in reversed(node.children))
+
+    @classmethod
+    def _splits(cls, node, prefix=()):
+        """Set of all rules (edge labels from the root to a node) of the
+        tree as 'label -> label -> ...' strings."""
+        rules = set()
+        for edge_label, child in node.children:
+            rule = prefix + (edge_label,)
+            rules.add(" -> ".join(rule))
+            rules |= cls._splits(child, rule)
+        return rules
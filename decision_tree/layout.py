@@ -0,0 +1,40 @@
+"""Shared Layout Parts of both Frontends."""
+
+
+# Stylesheet for the network
+network_stylesheet = [
+    {
+        'selector': 'node',
+        'style': {
+            'background-color': 'lightgrey',
+            'font-size': 12,
+            # place text in the middle
+            'text-valign': 'center',
+            'text-halign': 'center',
+            # Label is the text that will be displayed in the nodes
+            # By data(id) I select the id of the node as text
+            # At the beginning this is everybody
+            'label': 'data(id)'
+        }
+    },
+    {
+        'selector': 'edge',
+        'style': {
+            'line-color': 'yellow',
+            # In the label of the edges I store the applied threshold
+            'label': 'data(label)',
+            'font-size': 9
+        }
+    }
+]
+
+
+# Style of the header and the rows of the athlete DataTable
+table_style_header = {
+    'backgroundColor': 'rgb(30, 30, 30)',
+    'color': 'white'
+}
+table_style_data = {
+    'backgroundColor': 'grey',
+    'color': 'white'
+}
@@ -0,0 +1,400 @@
+"""Decision Tree Loading Frontend for Athlete Date.
+
+The app is created by create_app(). Importing this module does not load
+any data or connect to the database.
+"""
+
+
+import logging
+import threading
+import dash_cytoscape as cyto
+from dash import Dash, dash_table, dcc, html, Output, Input, State
+from dash.exceptions import PreventUpdate
+from decision_tree import storage
+from decision_tree.data import get_athlete_data
+from decision_tree.layout import network_stylesheet, table_style_header, \
+    table_style_data
+from decision_tree.sessions import Sessions
+from decision_tree.what_if import ColumnIndex, WhatIf
+
+# Message if the server does not know the session of the page (bsp: after a
+# restart of the server)
+SESSION_EXPIRED = "Session expired, please reload the page"
+# Number of moved athletes that are listed in the what-if result, the others
+# are only counted (the result is sent on every slider step)
+MAX_MOVED_SHOWN = 20
+
+logger = logging.getLogger(__name__)
+
+
+class LoadingSession:
+    """Tree that is loaded in one page (browser tab)."""
+    __slots__ = ('recommendations', 'tree_elements', 'what_if')
+
+    def __init__(self):
+        self.recommendations = {}
+        # Elements (nodes + edges) of the loaded tree
+        self.tree_elements = []
+        # Routing of all athletes through the loaded tree for the what-if
+        # mode. Is None if no tree is loaded.
+        self.what_if = None
+
+
+# session id -> LoadingSession
+sessions = Sessions()
+
+
+# Athlete values of the newest snapshot, shared by the what-if routing of
+# all sessions (see ColumnIndex)
+column_index = None
+index_lock = threading.Lock()
+
+
+def update_index(snapshot):
+    """New athlete data -> the shared index is updated once for all
+    sessions (only the changed athletes and tests). The routing of a session
+    is updated when the session uses it the next time (see get_what_if)."""
+    global column_index
+    with index_lock:
+        if column_index is None or column_index.version >= snapshot.version:
+            return
+        if column_index.version + 1 == snapshot.version:
+            column_index = column_index.updated(snapshot)
+        else:
+            # a missed snapshot -> created again when it is needed
+            column_index = None
+
+
+def get_column_index():
+    """Shared index of the newest snapshot."""
+    global column_index
+    snapshot = get_athlete_data().snapshot
+    with index_lock:
+        if column_index is None or column_index.version < snapshot.version:
+            column_index = ColumnIndex(snapshot.table, snapshot.version)
+        return column_index
+
+
+def serve_layout():
+    """Layout of the app. Is created every time the page is loaded, so the
+    table always shows the newest athlete data.
+    Every page gets its own session, so every tab can load another tree."""
+    table = get_athlete_data().snapshot.table
+    session_id = sessions.new(LoadingSession())
+    return html.Div([
+
+        html.H1("Decision Tree Loading"),
+
+        # id of the session -> every callback gets the tree of this page
+        dcc.Store(id='session-id', data=session_id),
+
+        # Show athlete Data
+        dash_table.DataTable(
+            data=table.to_dict('records'),
+            columns=[{'name': i, 'id': i} for i in table.columns],
+            page_size=5,
+            # Select one row at a time
+            row_selectable='single',
+            # Cells are editable -> allows to enter new values for athlete data
+            editable=True,
+            # Filter data directly in the table by entering expression in col
+            # bsp: "> 5" -> select only the athletes (rows) with "testID > 5"
+            filter_action='native',
+            id='data',
+            style_header=table_style_header,
+            style_data=table_style_data,
+        ),
+
+        html.Label("Please select a Tree: "),
+        # Contains all stored Trees. Updates once at the beginning.
+        html.Div(children=[dcc.Dropdown(id="tree-dropdown", clearable=False)],
+                 style={'width': 400}),
+
+        # Is needed for callback -- to load all stored trees at the beginning.
+        # Every callback needs an input. Is hidden
+        html.Div(children=[dcc.Input(id='nothing', type='number')],
+                 style={'visibility': 'hidden'}),
+
+        # Load and display the Tree
+        html.Button('Load Tree', id='load-tree'),
+        html.Br(),
+        html.Br(),
+
+        # Click to display the recommendation for the selected row of the table
+        html.Button('Display Recommendation', id='disp-recom'),
+
+        html.Br(),
+
+        # Network
+        html.Div([
+            html.Div(children=[
+
+                cyto.Cytoscape(
+                    id='network',
+                    elements=[],
+                    style={'width': '100%', 'height': '500px'},
+                    layout={'name': 'dagre', 'animate': True},
+                    stylesheet=network_stylesheet
+                ),
+            ], style={'width': '75%', 'display': 'inline-block'}),
+
+            # Display recommendation
+            html.Div(children=[
+                # Show which tree node is reached by the selected athlete row
+                html.Div(id="node", children=''),
+                html.Br(),
+                # show the recommendation
+                dcc.Textarea(
+                    id='recommendation',
+                    value='',
+                    style={'width': 400, 'height': 100},
+                ),
+            ], style={'width': '25%', 'display': 'inline-block',
+                      'vertical-align': 'top'}),
+        ]),
+
+        # What-if: move the threshold of one edge of the loaded tree and see
+        # how many athletes end in each leaf
+        html.Label("What-if: select an edge "),
+        html.Div(children=[dcc.Dropdown(id="edge-dropdown", options=[])],
+                 style={'width': 400}),
+        # updatemode='drag' -> updates while the slider is moved
+        dcc.Slider(id='threshold-slider', min=1, max=10, step=0.5,
+                   marks={i: str(i) for i in range(1, 11)}, value=5,
+                   updatemode='drag'),
+        # Athletes per leaf and athletes that change their leaf
+        html.Div(id='what-if', children=''),
+    ])
+
+
+def update_dropdown(tree, x):
+    """Displays all available trees in the dropdown menu.
+    Function is called once at the beginning.
+    """
+    # input should be (None, None)
+    if x is None and tree is None:
+        # rows =  [('tree1     ',), ('tree2     ',)]
+        ids = storage.tree_ids(storage.get_connection())
+        # return all ids + the first id as default to tree dropdown menu
+        return ids, ids[0]
+    else:
+        raise PreventUpdate
+
+
+def load_network(num_clicks, cur_tree, session_id):
+    """Display the selected Tree and store his recommendations and
+    elements in the session """
+    session = sessions.get(session_id)
+    if session is None:
+        return [], "", SESSION_EXPIRED, [], None, ""
+    # so it does not load at the beginning
+    if num_clicks is not None:
+        # Get all the data (nodes + keys and recommendations) from the tree
+        # stored in the database store. Select the tree id chosen in the
+        # dropdown menu.
+        # ([{'data': {'id': 'everybody', ...}},...],
+        # {'node1-l': 'node1-l test', 'node1-r': 'node1-r test'})
+        elements, session.recommendations = storage.load_tree(
+            storage.get_connection(), cur_tree)
+        # keep the elements on the server -> row_action does not need them
+        # from the network
+        session.tree_elements = elements
+        # new tree -> calculate the routing of the athletes again
+        session.what_if = None
+        what_if = get_what_if(session)
+        # the tree is shown even if the what-if routing failed, the edge
+        # dropdown is empty then
+        edges = what_if.edges() if what_if is not None else []
+        # return elements [nodes+edges] to network and all splits to the
+        # edge dropdown menu
+        # every time a new tree is shown the recommendation, the selected
+        # edge and the what-if result of the old tree get set to ""
+        return elements, "", "", edges, None, ""
+    # at the beginning -> return empty network elements (no tree)
+    return [], "", "", [], None, ""
+
+
+def get_what_if(session):
+    """Routing of the athletes through the tree loaded in the session.
+    After a refresh only the changed athletes are routed again. Is
+    calculated again if a new tree is loaded or if the changes of the
+    athlete data are not known anymore (see WhatIf.update).
+    Returns None if the tree can not be routed (bsp: an edge label that is
+    no threshold)."""
+    index = get_column_index()
+    if session.what_if is not None and session.what_if.update(index):
+        return session.what_if
+    try:
+        session.what_if = WhatIf(session.tree_elements, index)
+    except (KeyError, ValueError):
+        logger.exception("What-if routing of the loaded tree failed")
+        session.what_if = None
+    return session.what_if
+
+
+def select_edge(node, session_id):
+    """Move the slider to the stored threshold of the selected edge."""
+    session = sessions.get(session_id)
+    if node is None or session is None or not session.tree_elements:
+        raise PreventUpdate
+    what_if = get_what_if(session)
+    # edge of another tree (bsp: selected before a new tree was loaded)
+    if what_if is None or node not in what_if.splits:
+        raise PreventUpdate
+    return what_if.threshold(node)
+
+
+def threshold_sweep(threshold, node, session_id):
+    """Show the number of athletes per leaf if the threshold of the
+    selected edge is changed to the slider value.
+    Called every time the slider is moved. Only the athletes whose value
+    lies between the stored and the new threshold are routed again, so
+    dragging the slider stays fast for many athletes.
+
+    """
+    session = sessions.get(session_id)
+    if session is None:
+        return SESSION_EXPIRED
+    if node is None or threshold is None or not session.tree_elements:
+        raise PreventUpdate
+    cur_what_if = get_what_if(session)
+    # edge of another tree (bsp: selected before a new tree was loaded)
+    if cur_what_if is None or node not in cur_what_if.splits:
+        return ""
+    counts, moved = cur_what_if.sweep(node, threshold)
+    # bsp: "node1-l: 12 athletes (+2)"
+    lines = [html.Div(f"{leaf}: {count} athletes "
+                      f"({count - cur_what_if.counts[leaf]:+d})")
+             for leaf, count in counts.items()]
+    # bsp: "Moved: 1027 (node1-l -> node2-r), ... and 12 more"
+    # only the first MAX_MOVED_SHOWN athletes -> the response stays small
+    # while the slider is dragged
+    text = "Moved: " + ", ".join(
+        f"{athlete} ({old_leaf} -> {new_leaf})" for athlete, old_leaf,
+        new_leaf in moved[:MAX_MOVED_SHOWN])
+    if len(moved) > MAX_MOVED_SHOWN:
+        text += f", ... and {len(moved) - MAX_MOVED_SHOWN} more"
+    lines.append(html.Div(text))
+    return lines
+
+
+def row_action(num_clicks, index_list, data, session_id):
+    """Display recommendation for the selected athlete-row.
+    Function gets called when the Display Recommendation button is clicked.
+
+    Store all edges. Store for my athlete for every edge if the condition is
+    fulfilled (True) or not (False).
+    Store for every edge that is True the source and target node in dict.
+    Go through the dict and start at the first node (everybody) and see to
+    which target node it leads us. Then take this target node and see where it
+    leads us and so on until we have a node from which no edge is coming out.
+    """
+    session = sessions.get(session_id)
+    if session is None:
+        return "", SESSION_EXPIRED
+    # If the button is clicked, a row is selected and a tree is selected
+    if num_clicks is not None and index_list is not None and data is not None:
+        try:
+            # Get the data of the right athlete
+            athlete_row = (data[index_list[0]])
+            # Get all edges
+            edges = [item for item in session.tree_elements if
+                     next(iter(item['data'])) == "source"]
+            # Get all thresholds
+            # = [edge["data"]["label"] for edge in edges]
+            labels = [edges[i]["data"]["label"] for i in range(len(edges))]
+            # threshold[:3] = <testID>
+            # athlete[threshold[:3]] is the value of the athlete at this testID
+            # threshold[3:] is the criteria z.B. <=5
+            # athlete[threshold[:3]] +  threshold[3:] =  ['9<=5', '9>5']
+            # -> shows for each edge if its fulfilled
+            newlabels = [str(athlete_row[threshold[:3]]) + threshold[3:] for
+                         threshold in labels]
+            # Store for every edge if the Threshold is True or False
+            # [False, True] -> follow second edge
+            # order is the same as in edges
+            eval_newlabels = [eval(item) for item in newlabels]
+            # dict with all source and target node res[source_1] = target_1
+            res = {}
+            for i in range(len(edges)):
+                # if the threshold comparison for this athlete is True
+                # -> store source and target node for every fulfilled threshold
+                if eval_newlabels[i] == True:
+                    res[edges[i]["data"]["source"]] = edges[i]["data"][
+                        "target"]
+            # everybody is start node for every tree
+            # -> is always the first source node (if tree as only the root it's
+            # the end node)
+            current_node = "everybody"
+            # follow the fulfilled edges.
+            # res[everybody] = first_target -> res[first_target] =
+            # second_target ... res[target_n-1] = end_node
+            while current_node in res:
+                current_node = res[current_node]
+            # get recommendation if one is stored in the table
+            try:
+                recommend = session.recommendations[current_node]
+            # if no recommendation is stored for this node
+            except:
+                recommend = ''
+            return recommend, "Recommendation Node: " + \
+                              current_node
+        except:
+            return "", ""
+    else:
+        raise PreventUpdate
+
+
+def create_app():
+    """Create the app.
+    Loads the athlete data (if it is not loaded yet) and registers the
+    callbacks.
+
+    """
+    cyto.load_extra_layouts()
+    # Load the athlete data and refresh it in the background
+    get_athlete_data().subscribe(update_index)
+
+    # Initialize the app
+    # compress -> responses (bsp: the loaded tree) are sent gzip compressed
+    app = Dash(__name__, title="Decision Tree Loading",
+               prevent_initial_callbacks=True,
+               suppress_callback_exceptions=True,
+               compress=True)
+    app.layout = serve_layout
+
+    app.callback(Output('tree-dropdown', 'options'),
+                 Output('tree-dropdown', 'value'),
+                 State('tree-dropdown', 'value'),
+                 Input('nothing', 'value'))(update_dropdown)
+
+    app.callback(Output('network', 'elements'),
+                 Output('recommendation', 'value', allow_duplicate=True),
+                 Output("node", "children", allow_duplicate=True),
+                 Output('edge-dropdown', 'options'),
+                 Output('edge-dropdown', 'value'),
+                 Output('what-if', 'children', allow_duplicate=True),
+                 Input('load-tree', 'n_clicks'),
+                 State('tree-dropdown', 'value'),
+                 State('session-id', 'data'),
+                 prevent_initial_call=True)(load_network)
+
+    app.callback(Output('threshold-slider', 'value'),
+                 Input('edge-dropdown', 'value'),
+                 State('session-id', 'data'))(select_edge)
+
+    app.callback(Output('what-if', 'children', allow_duplicate=True),
+                 Input('threshold-slider', 'value'),
+                 Input('edge-dropdown', 'value'),
+                 State('session-id', 'data'),
+                 prevent_initial_call=True)(threshold_sweep)
+
+    app.callback(Output('recommendation', 'value', allow_duplicate=True),
+                 Output("node", "children", allow_duplicate=True),
+                 Input('disp-recom', 'n_clicks'),
+                 State('data', 'derived_virtual_selected_rows'),
+                 State('data', 'derived_virtual_data'),
+                 State('session-id', 'data'),
+                 prevent_initial_call=True)(row_action)
+    return app
+
@@ -0,0 +1,76 @@
+"""Server State of the Browser Sessions."""
+
+
+from collections import OrderedDict
+import threading
+from time import monotonic
+import uuid
+
+# Seconds a session is kept after it was used the last time. Every page
+# load (also a reload) creates a new session, so the old sessions of
+# closed or reloaded pages are removed after this time.
+SESSION_TTL = 4 * 60 * 60
+# Upper limit of sessions that are kept, only protects the memory. If
+# there are more, the session that was not used the longest time is
+# removed even if it is not expired.
+MAX_SESSIONS = 1000
+
+
+class Sessions:
+    """State of every open page, keyed by a session id.
+
+    The session id is created when the layout is served and stored in the
+    page (dcc.Store), every callback gets it as State. So every tab has its
+    own tree, like before the tree was kept on the server.
+    A session expires ttl seconds after it was used the last time.
+    The sessions are kept in the memory of this process. If an app runs
+    with more than one worker process the requests of one page have to be
+    sent to the same worker (sticky sessions); another worker does not know
+    the session and get() returns None.
+
+    """
+
+    def __init__(self, ttl=SESSION_TTL, max_sessions=MAX_SESSIONS):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        # session id -> [state, time of the last use]
+        # ordered by the last use (last element = used last)
+        self.states = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _expire(self, now):
+        """Remove the expired sessions (lock has to be held)."""
+        while self.states:
+            session_id, (_, last_use) = next(iter(self.states.items()))
+            if now - last_use < self.ttl and \
+                    len(self.states) <= self.max_sessions:
+                break
+            del self.states[session_id]
+
+    def new(self, state):
+        """Store state under a new session id and return the id."""
+        session_id = uuid.uuid4().hex
+        now = monotonic()
+        with self.lock:
+            self.states[session_id] = [state, now]
+            self._expire(now)
+        return session_id
+
+    def get(self, session_id):
+        """State of the session or None if the session is unknown or
+        expired."""
+        now = monotonic()
+        with self.lock:
+            self._expire(now)
+            entry = self.states.get(session_id)
+            if entry is None:
+                return None
+            entry[1] = now
+            self.states.move_to_end(session_id)
+            return entry[0]
+
+    def values(self):
+        """States of all sessions."""
+        with self.lock:
+            self._expire(monotonic())
+            return [state for state, _ in self.states.values()]
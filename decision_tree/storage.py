@@ -0,0 +1,268 @@
+"""Storage of the Trees in the postgres Database.
+
+All trees are stored in the table "store" with three columns:
+    tree_id (character(10)) -> Primary Key
+    elements (json) -> nodes + edges of the network
+    recommendations (json) -> recommendation of each leaf node
+"""
+
+
+import csv
+import io
+import json
+
+# What to do when a tree_id of the file is already stored
+CONFLICT_MODES = ('skip', 'overwrite', 'version')
+# tree_id is stored as character(10)
+ID_LENGTH = 10
+
+
+# Connection of the running app (see get_connection)
+connection = None
+
+
+def get_connection():
+    """Return the connection to the database.
+    The connection is created the first time it is needed (and again if it
+    was closed), so importing this module does not connect to the database.
+
+    """
+    global connection
+    if connection is None or connection.closed:
+        # psycopg2 is a Python adapter for PostgreSQL database
+        from psycopg2 import connect
+        connection = connect(
+            dbname="postgres",
+            user="postgres",
+            host="localhost",
+            password="postgres")
+    return connection
+
+
+def create_table(conn):
+    """Create the table store if it does not already exist.
+    TABLESPACE pg_default; -> Table is stored in default tablespace"""
+    query = '''
+    CREATE TABLE IF NOT EXISTS public.store
+    (
+        tree_id character(10) COLLATE pg_catalog."default" NOT NULL,
+        elements json,
+        recommendations json,
+        CONSTRAINT store_pkey PRIMARY KEY (tree_id)
+    )
+    TABLESPACE pg_default;
+    '''
+    cursor = conn.cursor()
+    cursor.execute(query)
+    conn.commit()
+    # Close cursor object to avoid memory leaks
+    cursor.close()
+
+
+def tree_ids(conn):
+    """Sorted ids of all stored trees."""
+    cursor = conn.cursor()
+    cursor.execute('''select tree_id from store''')
+    # rows =  [('tree1     ',), ('tree2     ',)]
+    ids = sorted(row[0] for row in cursor.fetchall())
+    cursor.close()
+    return ids
+
+
+def load_tree(conn, tree_id):
+    """Elements and recommendations of a stored tree.
+    bsp: ([{'data': {'id': 'everybody', ...}},...],
+          {'node1-l': 'node1-l test', 'node1-r': 'node1-r test'})"""
+    cursor = conn.cursor()
+    query = '''select * from public.store where tree_id = %(tree)s;'''
+    cursor.execute(query, {'tree': tree_id})
+    row = cursor.fetchone()
+    cursor.close()
+    return row[1], row[2]
+
+
+def store_tree(conn, tree_id, elements, recommendations):
+    """Store a tree (nodes + edges) + recommendations.
+    Raises an error if the tree_id exists already."""
+    cursor = conn.cursor()
+    # create query with placeholders
+    query = '''INSERT INTO store VALUES (%s,%s, %s)'''
+    try:
+        # Convert Tree elements (nodes + edges) and recommendations to JSON
+        # objects
+        cursor.execute(query, (
+            tree_id, json.dumps(elements), json.dumps(recommendations)))
+        conn.commit()
+    except:
+        # otherwise the connection can not be used for the next query
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def export_trees(conn, path, tree_ids=None):
+    """Write the trees to path (one JSON object per line).
+    Returns the number of exported trees."""
+    # named cursor -> the rows are fetched in batches from the server and
+    # not all at once
+    cursor = conn.cursor(name='export_trees')
+    cursor.itersize = 1000
+    query = '''select tree_id, elements, recommendations from public.store'''
+    number = 0
+    try:
+        if tree_ids:
+            cursor.execute(query + ''' where tree_id = any(%s)''',
+                           (list(tree_ids),))
+        else:
+            cursor.execute(query)
+        with open(path, 'w') as f:
+            for tree_id, elements, recommendations in cursor:
+                # character(10) is padded with spaces
+                f.write(json.dumps({'tree_id': tree_id.rstrip(),
+                                    'elements': elements,
+                                    'recommendations': recommendations}) +
+                        "\n")
+                number += 1
+    finally:
+        cursor.close()
+        # a named cursor only exists in a transaction -> end it
+        conn.rollback()
+    return number
+
+
+def read_trees(path):
+    """Read the trees of an exported file. All trees are returned in the
+    order of the file, also if a tree_id is contained more than once
+    (bsp: two exports in one file, see import_trees).
+    Raises ValueError with the numbers of all lines that are no valid tree
+    (no JSON, missing keys or a tree_id that does not fit into
+    character(10)), so nothing is sent to the database.
+
+    """
+    trees = []
+    bad_lines = []
+    with open(path, 'r') as f:
+        for number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                tree = json.loads(line)
+            except ValueError:
+                bad_lines.append(number)
+                continue
+            tree_id = tree.get('tree_id') if isinstance(tree, dict) else None
+            # character(10) ignores spaces at the end
+            if not isinstance(tree_id, str) or not tree_id.rstrip() or \
+                    len(tree_id.rstrip()) > ID_LENGTH or \
+                    'elements' not in tree or 'recommendations' not in tree:
+                bad_lines.append(number)
+                continue
+            tree['tree_id'] = tree_id.rstrip()
+            trees.append(tree)
+    if bad_lines:
+        raise ValueError(
+            f"Invalid trees (tree_id has to have 1 to {ID_LENGTH} "
+            f"characters) in lines: {', '.join(map(str, bad_lines))}")
+    return trees
+
+
+def last_trees(trees):
+    """Keep only the last tree of every tree_id (a tree_id can only be
+    inserted once). Returns the trees and the number of removed trees."""
+    last = {}
+    for tree in trees:
+        last[tree['tree_id']] = tree
+    return list(last.values()), len(trees) - len(last)
+
+
+def version_ids(trees, used_ids):
+    """Give every tree whose tree_id is in used_ids or was used by an
+    earlier tree of the file a new id (bsp: tree1_2), so every tree is
+    stored. used_ids is changed."""
+    for tree in trees:
+        if tree['tree_id'] in used_ids:
+            tree['tree_id'] = new_version_id(tree['tree_id'], used_ids)
+        used_ids.add(tree['tree_id'])
+    return trees
+
+
+def new_version_id(tree_id, used_ids):
+    """Return the first id "<tree_id>_<n>" (n = 2, 3, ...) that is not used.
+    The tree_id is shortened so the new id fits into character(10)."""
+    n = 2
+    while True:
+        suffix = f"_{n}"
+        new_id = tree_id[:ID_LENGTH - len(suffix)] + suffix
+        if new_id not in used_ids:
+            return new_id
+        n += 1
+
+
+def import_trees(conn, path, on_conflict='skip'):
+    """Import the trees of path into the table store.
+
+    All trees are copied (COPY) into a temporary table and inserted from
+    there with a single query, so there is only one round trip per import.
+    Everything happens in one transaction: either all trees are imported or
+    none.
+    on_conflict: what to do if a tree_id exists already
+        skip -> keep the stored tree
+        overwrite -> replace the stored tree
+        version -> store the tree under a new id (bsp: tree1_2)
+    If a tree_id is contained more than once in path, version stores every
+    tree under its own id, skip and overwrite use the last tree of the
+    file.
+    Returns the number of inserted/updated trees and the number of trees
+    of the file that were replaced by a later tree with the same tree_id.
+    Raises ValueError for an unknown on_conflict or invalid trees in path.
+
+    """
+    if on_conflict not in CONFLICT_MODES:
+        raise ValueError(f"on_conflict has to be one of {CONFLICT_MODES}, "
+                         f"not {on_conflict!r}")
+    trees = read_trees(path)
+    superseded = 0
+    if on_conflict != 'version':
+        trees, superseded = last_trees(trees)
+    cursor = conn.cursor()
+    try:
+        if on_conflict == 'version':
+            # No other transaction can store a tree until the import is
+            # committed -> the new ids are still free when they are inserted
+            cursor.execute('''LOCK TABLE public.store
+                              IN SHARE ROW EXCLUSIVE MODE''')
+            cursor.execute('''select tree_id from public.store''')
+            version_ids(trees, {row[0].rstrip() for row in cursor.fetchall()})
+        # COPY expects a file -> write the trees as csv into memory
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for tree in trees:
+            writer.writerow((tree['tree_id'], json.dumps(tree['elements']),
+                             json.dumps(tree['recommendations'])))
+        buffer.seek(0)
+        # Temporary table is deleted at the end of the transaction
+        cursor.execute('''CREATE TEMP TABLE import_store
+                          (LIKE public.store INCLUDING DEFAULTS)
+                          ON COMMIT DROP''')
+        cursor.copy_expert('''COPY import_store FROM STDIN WITH
+                              (FORMAT csv)''', buffer)
+        query = '''INSERT INTO public.store
+                   SELECT * FROM import_store '''
+        if on_conflict == 'overwrite':
+            query += '''ON CONFLICT (tree_id) DO UPDATE SET
+                        elements = EXCLUDED.elements,
+                        recommendations = EXCLUDED.recommendations'''
+        else:
+            # skip (version -> the new ids are not stored yet)
+            query += '''ON CONFLICT (tree_id) DO NOTHING'''
+        cursor.execute(query)
+        number = cursor.rowcount
+        conn.commit()
+    except:
+        # Nothing is imported if one tree can not be stored
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+    return number, superseded
@@ -0,0 +1,232 @@
+"""What-if Threshold Sweep for stored Trees."""
+
+
+from bisect import bisect_right
+from math import isnan, nan
+import threading
+
+# Number of versions a WhatIf can be behind the newest index and still catch
+# up with only the changed athletes. Older WhatIfs are created again.
+MAX_CHANGES = 20
+
+
+def parse_label(label):
+    """Split an edge label into testID, comparison and threshold.
+    bsp: '715<=5' -> ('715', '<=', 5.0), '715>5' -> ('715', '>', 5.0)"""
+    comparison = '<=' if '<=' in label else '>'
+    test_id, threshold = label.split(comparison)
+    return test_id, comparison, float(threshold)
+
+
+class ColumnIndex:
+    """Athlete values of one snapshot, shared by the WhatIf of all trees.
+
+    rows contains the values of every athlete. The sorted values of a test
+    are created the first time they are needed and then used for every
+    slider step. Athletes without a value for the test are not in the
+    sorted values.
+    An index is not changed after it is created (only sorted values are
+    added), so a WhatIf that still uses it stays consistent. updated()
+    creates the index of the next snapshot.
+
+    """
+
+    def __init__(self, table, version=0, rows=None, columns=None,
+                 changes=None):
+        self.table = table
+        # version of the snapshot of the table
+        self.version = version
+        # athleteID -> {testID: value}
+        self.rows = table.drop(columns='athID').to_dict('index') if \
+            rows is None else rows
+        # testID -> (sorted values, athleteIDs in the same order)
+        self.columns = {} if columns is None else columns
+        # version -> (changed athleteIDs, changed testIDs) of the last
+        # MAX_CHANGES versions. WhatIfs of an older version use them to
+        # catch up (see WhatIf.update).
+        self.changes = {} if changes is None else changes
+
+    def column(self, test_id):
+        if test_id not in self.columns:
+            if test_id not in self.table:
+                # test of the tree that no athlete has -> empty index
+                import numpy as np
+                return np.array([]), np.array([])
+            column = self.table[test_id].dropna().sort_values(kind='stable')
+            self.columns[test_id] = (column.to_numpy(),
+                                     column.index.to_numpy())
+        return self.columns[test_id]
+
+    def updated(self, snapshot):
+        """Index of snapshot, which has to be the next version.
+        Only the rows of the changed athletes are created again and only the
+        sorted values of the changed tests are dropped."""
+        table = snapshot.table
+        rows = dict(self.rows)
+        for athlete in snapshot.changed:
+            rows[athlete] = table.loc[athlete].drop('athID').to_dict()
+        columns = {test_id: column for test_id, column in
+                   self.columns.items() if
+                   test_id not in snapshot.changed_tests}
+        changes = {version: change for version, change in
+                   self.changes.items() if
+                   version > snapshot.version - MAX_CHANGES}
+        changes[snapshot.version] = (snapshot.changed,
+                                     snapshot.changed_tests)
+        return ColumnIndex(table, snapshot.version, rows, columns, changes)
+
+
+class WhatIf:
+    """Move the threshold of one split of a stored tree and see which
+    athletes end in which leaf.
+
+    At the start every athlete is routed through the tree once. For a new
+    threshold only the athletes whose value lies between the old and the new
+    threshold change the side of the split. They are found by binary search
+    in the sorted values of the athletes that reach the split, and only they
+    are routed again through the other subtree.
+
+    """
+
+    def __init__(self, elements, index):
+        # Athlete values (shared with the WhatIf of other trees). Only the
+        # routing of this tree is stored in the WhatIf.
+        self.index = index
+        # callbacks of the same page (update, sweep) can run at the same
+        # time
+        self.lock = threading.Lock()
+        # node id -> (testID, threshold, left child, right child)
+        self.splits = {}
+        nodes = [item['data']['id'] for item in elements if
+                 next(iter(item['data'])) == "id"]
+        for item in elements:
+            if next(iter(item['data'])) == "source":
+                test_id, comparison, threshold = \
+                    parse_label(item['data']['label'])
+                split = self.splits.setdefault(
+                    item['data']['source'], [test_id, threshold, None, None])
+                split[2 if comparison == '<=' else 3] = \
+                    item['data']['target']
+        self.leaves = [node for node in nodes if node not in self.splits]
+        # node id -> athletes that reach the node
+        self.members = {node: set() for node in nodes}
+        # athleteID -> leaf (None if a value on the way is missing)
+        self.leaf_of = {}
+        for athlete in index.rows:
+            self.leaf_of[athlete] = self.route(athlete, 'everybody',
+                                               self.members)
+        self.counts = {leaf: len(self.members[leaf]) for leaf in self.leaves}
+        # split node -> sorted values + athletes of the athletes that reach
+        # the split node
+        self.sorted = {}
+
+    def route(self, athlete, node, members=None):
+        """Follow the splits from node to a leaf for one athlete.
+        Returns None if the athlete has no value for a test on the way
+        (like in the tree creation these athletes are in no child node)."""
+        while node is not None:
+            if members is not None:
+                members[node].add(athlete)
+            if node not in self.splits:
+                return node
+            test_id, threshold, left, right = self.splits[node]
+            # test that is not in the athlete data (bsp: '799') -> no value
+            value = self.index.rows[athlete].get(test_id, nan)
+            if isnan(value):
+                return None
+            node = left if value <= threshold else right
+        return None
+
+    def edges(self):
+        """Dropdown options of all splits: 'everybody: 715<=5'."""
+        return [{'label': f"{node}: {test_id}<={threshold:g}",
+                 'value': node} for node, (test_id, threshold, _, _) in
+                self.splits.items()]
+
+    def threshold(self, node):
+        """Threshold of a split as it is stored in the tree."""
+        return self.splits[node][1]
+
+    def sweep(self, node, threshold):
+        """Use threshold for the split node instead of the stored one.
+
+        Returns the number of athletes per leaf and a list with the athletes
+        that change their leaf: [(athleteID, old leaf, new leaf), ...].
+
+        """
+        with self.lock:
+            test_id, old_threshold, left, right = self.splits[node]
+            if node not in self.sorted:
+                # numpy is only imported when the what-if mode is used
+                import numpy as np
+                values, athletes = self.index.column(test_id)
+                reach = np.isin(athletes, list(self.members[node]))
+                self.sorted[node] = (values[reach], athletes[reach])
+            values, athletes = self.sorted[node]
+            # position of the first athlete that goes to the right child
+            old_pos = bisect_right(values, old_threshold)
+            new_pos = bisect_right(values, threshold)
+            # The athletes between both positions change the side
+            # bigger threshold -> from right to left, smaller -> left to right
+            target = left if new_pos > old_pos else right
+            moved = []
+            counts = dict(self.counts)
+            first, last = sorted((old_pos, new_pos))
+            for athlete in athletes[first:last]:
+                old_leaf = self.leaf_of[athlete]
+                new_leaf = self.route(athlete, target)
+                if old_leaf != new_leaf:
+                    moved.append((athlete, old_leaf, new_leaf))
+                    if old_leaf is not None:
+                        counts[old_leaf] -= 1
+                    if new_leaf is not None:
+                        counts[new_leaf] += 1
+            return counts, moved
+
+    def update(self, index):
+        """Use index, the index of the same or a newer snapshot.
+
+        Only the athletes that changed since the version of the current
+        index are routed again and only the sorted values of split nodes
+        that these athletes reach (before or after) or that use a changed
+        test are calculated again.
+        Returns False if the changes are not known anymore (see
+        ColumnIndex.changes), then the WhatIf has to be created again.
+
+        """
+        with self.lock:
+            # the index of an older snapshot is not used
+            if index.version <= self.index.version:
+                return True
+            versions = range(self.index.version + 1, index.version + 1)
+            if any(version not in index.changes for version in versions):
+                return False
+            changed = set()
+            changed_tests = set()
+            for version in versions:
+                changed |= index.changes[version][0]
+                changed_tests |= index.changes[version][1]
+            self.index = index
+            # split nodes whose sorted values are not valid anymore
+            changed_nodes = {node for node, split in self.splits.items() if
+                             split[0] in changed_tests}
+            for athlete in changed:
+                for node, members in self.members.items():
+                    if athlete in members:
+                        members.discard(athlete)
+                        changed_nodes.add(node)
+                old_leaf = self.leaf_of.get(athlete)
+                if old_leaf is not None:
+                    self.counts[old_leaf] -= 1
+                new_members = {node: set() for node in self.members}
+                new_leaf = self.route(athlete, 'everybody', new_members)
+                for node, members in new_members.items():
+                    if members:
+                        self.members[node].add(athlete)
+                        changed_nodes.add(node)
+                self.leaf_of[athlete] = new_leaf
+                if new_leaf is not None:
+                    self.counts[new_leaf] += 1
+            for node in changed_nodes:
+                self.sorted.pop(node, None)
+            return True
@@ -0,0 +1,163 @@
+"""Tests for the callbacks of the tree creation app."""
+
+
+from contextvars import copy_context
+import json
+import pytest
+from dash import Patch, no_update
+from dash._callback_context import context_value
+from dash._utils import AttributeDict
+from decision_tree import creation
+from decision_tree.creation import CreationSession, sessions, \
+    update_elements
+from decision_tree.data import AthleteData, data_file
+
+
+@pytest.fixture
+def athlete_data(monkeypatch):
+    with open(data_file, 'r') as f:
+        athlete_data = AthleteData(json.loads(f.read())['res'])
+    table = athlete_data.snapshot.table
+    # like create_app, without downloading the data
+    monkeypatch.setattr(creation, 'test_ids',
+                        [i for i in table.columns if i != 'athID'])
+    return athlete_data
+
+
+def press(session_id, button, threshold=5, node='everybody', branch=None,
+          branch_name=None):
+    """Call update_elements like Dash does when button is pressed."""
+    args = [None] * (len(creation.test_ids) + 4) + \
+        [threshold, node, branch_name, session_id]
+    args[len(creation.test_ids) + 3] = branch
+    prop = 'value' if button == 'branch-dropdown' else 'n_clicks'
+
+    def run():
+        context_value.set(AttributeDict(
+            triggered_inputs=[{'prop_id': f"{button}.{prop}"}]))
+        return update_elements(*args)
+
+    return copy_context().run(run)
+
+
+def athletes(table, test_id, threshold):
+    """Labels of the left and right node of a split of all athletes."""
+    column = table[test_id].dropna()
+    return (str(column[column <= threshold].index.tolist()),
+            str(column[column > threshold].index.tolist()))
+
+
+def test_split_uses_snapshot_of_the_page(athlete_data):
+    session_id = sessions.new(CreationSession(athlete_data.snapshot))
+    old = athlete_data.snapshot.table
+    # refresh after the page was loaded: 2991 (715 = 2) moves to the right
+    athlete_data.merge([{"athleteID": 2991, "testID": 715, "testValue": 20,
+                         "date": "2024-01-01"}])
+    press(session_id, '715')
+    history = sessions.get(session_id).history
+    left, right = history.find('everybody').children
+    assert (left[1].label, right[1].label) == athletes(old, '715', 5)
+    assert '2991' in left[1].label
+
+
+def apply(patch, value):
+    """Change value with the operations of patch like the browser does."""
+    value = list(value)
+    for operation in patch._operations:
+        assert operation['location'] == []
+        item = operation['params']['value']
+        if operation['operation'] == 'Extend':
+            value.extend(item)
+        elif operation['operation'] == 'Append':
+            value.append(item)
+        else:
+            assert operation['operation'] == 'Remove'
+            value = [element for element in value if element != item]
+    return value
+
+
+class Page:
+    """Network elements and leaves shown in the browser."""
+
+    def __init__(self, athlete_data):
+        self.session_id = sessions.new(
+            CreationSession(athlete_data.snapshot))
+        self.history = sessions.get(self.session_id).history
+        self.elements = self.history.elements()
+        self.leaves = ['everybody']
+
+    def press(self, button, **kwargs):
+        elements, message, branches, leaves, value = \
+            press(self.session_id, button, **kwargs)
+        # only the changes are sent
+        if isinstance(elements, Patch):
+            self.elements = apply(elements, self.elements)
+        elif elements is not no_update:
+            self.elements = elements
+        if isinstance(leaves, Patch):
+            self.leaves = apply(leaves, self.leaves)
+        elif leaves is not no_update:
+            self.leaves = leaves
+        return elements, message, value
+
+    def matches_history(self):
+        """True if the page shows the current version of the history (the
+        order of the patched elements can differ)."""
+        return sorted(map(json.dumps, self.elements)) == \
+            sorted(map(json.dumps, self.history.elements())) and \
+            sorted(self.leaves) == sorted(self.history.leaves())
+
+
+def test_split_undo_redo_patches(athlete_data):
+    page = Page(athlete_data)
+    elements, message, value = page.press('715')
+    assert [op['operation'] for op in elements._operations] == ['Extend']
+    assert (message, value) == ("", 'node1-l')
+    assert page.matches_history()
+    assert page.press('712', threshold=3, node='node1-r')[2] == 'node2-l'
+    assert page.leaves == ['node1-l', 'node2-l', 'node2-r']
+    assert page.matches_history()
+    # undo removes the nodes + edges of the split, node1-r is a leaf again
+    elements, message, value = page.press('undo')
+    assert {op['operation'] for op in elements._operations} == {'Remove'}
+    assert value == 'node1-r'
+    assert sorted(page.leaves) == ['node1-l', 'node1-r']
+    assert page.matches_history()
+    page.press('redo')
+    assert page.leaves == ['node1-l', 'node2-l', 'node2-r']
+    assert page.matches_history()
+    page.press('undo')
+    page.press('undo')
+    assert page.elements == page.history.elements()
+    assert page.leaves == ['everybody']
+    assert page.press('undo')[1] == "NOTHING TO UNDO"
+
+
+def test_split_of_no_leaf(athlete_data):
+    page = Page(athlete_data)
+    page.press('715')
+    elements, message, _ = page.press('712')
+    assert elements is no_update
+    assert message == "NODE IS NO LEAF"
+    assert page.matches_history()
+
+
+def test_switch_branch_sends_whole_tree(athlete_data):
+    page = Page(athlete_data)
+    page.press('715')
+    page.press('712', threshold=3, node='node1-r')
+    page.press('save-branch', branch_name='a')
+    page.press('undo')
+    page.press('711', threshold=4, node='node1-l')
+    elements, _, value = page.press('branch-dropdown', branch='a')
+    assert not isinstance(elements, Patch)
+    assert elements == page.history.elements()
+    assert value == 'node1-l'
+    assert page.matches_history()
+    assert page.history.find('node3-l') is None
+
+
+def test_expired_session():
+    elements, message, _, _, _ = press('unknown', 'undo')
+    assert elements is no_update
+    assert message == creation.SESSION_EXPIRED
@@ -0,0 +1,75 @@
+"""Tests for the athlete data refresh."""
+
+
+import json
+import pandas as pd
+import pytest
+from decision_tree import data
+from decision_tree.data import AthleteData, data_file
+
+
+@pytest.fixture
+def records():
+    with open(data_file, 'r') as f:
+        return json.loads(f.read())['res']
+
+
+def pivot(records):
+    """Table like it is created without refresh."""
+    frame = pd.json_normalize(records)
+    frame['testID'] = frame['testID'].astype(str)
+    return frame.pivot_table(index="athleteID", columns="testID",
+                             values="testValue")
+
+
+def test_merge_matches_full_pivot(records):
+    athlete_data = AthleteData(records)
+    new = [dict(records[0], testValue=records[0]['testValue'] + 1,
+                date='2024-01-01'),
+           {"athleteID": 1, "testID": 999, "testValue": 3,
+            "date": "2024-01-01"}]
+    snapshot = athlete_data.merge(new)
+    assert snapshot.version == 1
+    assert snapshot.changed == {1, records[0]['athleteID']}
+    expected = pivot(records + new)
+    pd.testing.assert_frame_equal(
+        snapshot.table.drop(columns='athID'), expected, check_dtype=False,
+        check_names=False)
+
+
+def test_merge_without_changes(records):
+    athlete_data = AthleteData(records)
+    assert athlete_data.merge(records) is None
+    assert athlete_data.snapshot.version == 0
+
+
+def test_invalid_records_are_skipped(records):
+    athlete_data = AthleteData(records)
+    old = athlete_data.snapshot.table.at[2991, '712']
+    snapshot = athlete_data.merge([
+        {"athleteID": 2991, "testID": 712, "testValue": 9,
+         "date": "2024-01-01"},
+        {"athleteID": 2991, "testID": 713, "testValue": "x",
+         "date": "2024-01-01"},
+        {"athleteID": 2991, "testID": 714}])
+    assert snapshot.table.at[2991, '712'] == (old + 9) / 2
+
+
+def test_failed_merge_changes_nothing(records, monkeypatch):
+    athlete_data = AthleteData(records)
+    old = athlete_data.snapshot
+    record = {"athleteID": 2991, "testID": 712, "testValue": 9,
+              "date": "2024-01-01"}
+
+    def broken_snapshot(*args):
+        raise RuntimeError("broken")
+
+    monkeypatch.setattr(data, 'Snapshot', broken_snapshot)
+    with pytest.raises(RuntimeError):
+        athlete_data.merge([record])
+    monkeypatch.undo()
+    assert athlete_data.snapshot is old
+    # the record is still new -> its cell is calculated on the next refresh
+    snapshot = athlete_data.merge([record])
+    assert snapshot.table.at[2991, '712'] == \
+        (old.table.at[2991, '712'] + 9) / 2
@@ -0,0 +1,80 @@
+"""Tests for the persistent tree history."""
+
+
+from decision_tree.history import TreeHistory
+
+
+def split(history, leaf_id, number, test_id, threshold, left, right):
+    """Split leaf_id into node<number>-l and node<number>-r."""
+    return history.split(
+        leaf_id,
+        (f"node{number}-l", str(left), f"{test_id}<={threshold}"),
+        (f"node{number}-r", str(right), f"{test_id}>{threshold}"))
+
+
+def small_tree():
+    history = TreeHistory('[1, 2, 3]')
+    split(history, 'everybody', 1, '715', 5, [1], [2, 3])
+    split(history, 'node1-r', 2, '712', 3, [2], [3])
+    return history
+
+
+def test_split_shares_unchanged_nodes():
+    history = small_tree()
+    version = history.current
+    # node1-l was not on the path to node1-r -> same object in both versions
+    assert version.root.children[0][1] is version.parent.root.children[0][1]
+    assert history.leaves() == ['node1-l', 'node2-l', 'node2-r']
+
+
+def test_split_of_no_leaf_returns_none():
+    history = small_tree()
+    version = history.current
+    assert split(history, 'node1-r', 3, '711', 4, [2], [3]) is None
+    assert split(history, 'unknown', 3, '711', 4, [2], [3]) is None
+    assert history.current is version
+
+
+def test_undo_redo():
+    history = small_tree()
+    assert history.undo()
+    assert history.leaves() == ['node1-l', 'node1-r']
+    assert history.undo()
+    assert history.leaves() == ['everybody']
+    assert not history.undo()
+    assert history.redo()
+    assert history.redo()
+    assert history.leaves() == ['node1-l', 'node2-l', 'node2-r']
+    assert not history.redo()
+
+
+def test_new_split_clears_redo():
+    history = small_tree()
+    history.undo()
+    split(history, 'node1-l', 3, '711', 4, [1], [])
+    assert not history.redo()
+    # node2-* were undone -> not in the current version
+    assert history.find('node2-l') is None
+
+
+def test_split_elements():
+    history = small_tree()
+    assert history.split_elements() == [
+        {'data': {'id': 'node2-l', 'label': '[2]'}},
+        {'data': {'id': 'node2-r', 'label': '[3]'}},
+        {'data': {'source': 'node1-r', 'target': 'node2-l',
+                  'label': '712<=3'}},
+        {'data': {'source': 'node1-r', 'target': 'node2-r',
+                  'label': '712>3'}}]
+
+
+def test_branches():
+    history = small_tree()
+    history.save_branch('a')
+    history.undo()
+    split(history, 'node1-r', 3, '711', 4, [2, 3], [])
+    assert history.compare('a') == (['715>5 -> 711<=4', '715>5 -> 711>4'],
+                                    ['715>5 -> 712<=3', '715>5 -> 712>3'])
+    history.switch_branch('a')
+    assert history.leaves() == ['node1-l', 'node2-l', 'node2-r']
+    assert history.compare('a') == ([], [])
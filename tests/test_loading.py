@@ -0,0 +1,54 @@
+"""Tests for the what-if callbacks of the tree loading app."""
+
+
+import json
+import pytest
+from decision_tree import data, loading
+from decision_tree.data import AthleteData, data_file
+from decision_tree.loading import LoadingSession, get_what_if, sessions, \
+    threshold_sweep, update_index
+from tests.test_what_if import tree
+
+
+@pytest.fixture
+def athlete_data(monkeypatch):
+    with open(data_file, 'r') as f:
+        athlete_data = AthleteData(json.loads(f.read())['res'])
+    # like get_athlete_data, without downloading the data
+    monkeypatch.setattr(data, 'athlete_data', athlete_data)
+    monkeypatch.setattr(loading, 'column_index', None)
+    return athlete_data
+
+
+def open_page(elements):
+    """Session of a page that loaded the tree elements."""
+    session_id = sessions.new(LoadingSession())
+    sessions.get(session_id).tree_elements = elements
+    return session_id
+
+
+def test_sessions_share_the_index(athlete_data):
+    first = sessions.get(open_page(tree(5, 3)))
+    second = sessions.get(open_page(tree(4, 2)))
+    assert get_what_if(first).index is get_what_if(second).index
+    old_what_if = first.what_if
+    update_index(athlete_data.merge([
+        {"athleteID": 2991, "testID": 712, "testValue": 1,
+         "date": "2024-01-01"}]))
+    assert loading.column_index.version == 1
+    # the routing is updated (not created again) when it is used
+    assert get_what_if(first) is old_what_if
+    assert get_what_if(first).index is loading.column_index
+    assert get_what_if(second).index is loading.column_index
+
+
+def test_moved_athletes_are_capped(athlete_data):
+    session_id = open_page(tree(5, 3))
+    _, moved = get_what_if(sessions.get(session_id)).sweep(
+        'everybody', 1)
+    assert len(moved) > loading.MAX_MOVED_SHOWN
+    lines = threshold_sweep(1, 'everybody', session_id)
+    text = lines[-1].children
+    assert text.count('->') == loading.MAX_MOVED_SHOWN
+    assert text.endswith(
+        f"... and {len(moved) - loading.MAX_MOVED_SHOWN} more")
@@ -0,0 +1,43 @@
+"""Tests for the session states."""
+
+
+from decision_tree import sessions as sessions_module
+from decision_tree.sessions import Sessions
+
+
+def test_every_session_has_its_own_state():
+    sessions = Sessions()
+    first = sessions.new({'tree': 1})
+    second = sessions.new({'tree': 2})
+    assert first != second
+    assert sessions.get(first) == {'tree': 1}
+    assert sessions.get(second) == {'tree': 2}
+    assert sessions.get('unknown') is None
+
+
+def test_least_recently_used_session_is_removed():
+    sessions = Sessions(max_sessions=2)
+    first = sessions.new('first')
+    second = sessions.new('second')
+    # first was used last -> second is removed
+    sessions.get(first)
+    third = sessions.new('third')
+    assert sessions.get(second) is None
+    assert sessions.get(first) == 'first'
+    assert sessions.get(third) == 'third'
+
+
+def test_unused_session_expires(monkeypatch):
+    now = [0]
+    monkeypatch.setattr(sessions_module, 'monotonic', lambda: now[0])
+    sessions = Sessions(ttl=100)
+    first = sessions.new('first')
+    second = sessions.new('second')
+    now[0] = 60
+    assert sessions.get(first) == 'first'
+    # second was not used for 100 seconds, first only for 40
+    now[0] = 100
+    assert sessions.get(second) is None
+    assert sessions.get(first) == 'first'
+    now[0] = 200
+    assert sessions.values() == []
@@ -0,0 +1,69 @@
+"""Tests for the tree storage functions that do not need a database."""
+
+
+import json
+import pytest
+from decision_tree.storage import ID_LENGTH, import_trees, last_trees, \
+    new_version_id, read_trees, version_ids
+
+
+def tree(tree_id):
+    return {'tree_id': tree_id, 'elements': [], 'recommendations': {}}
+
+
+def write_lines(path, lines):
+    path.write_text("\n".join(lines) + "\n")
+    return path
+
+
+def test_new_version_id():
+    assert new_version_id('tree1', {'tree1'}) == 'tree1_2'
+    assert new_version_id('tree1', {'tree1', 'tree1_2'}) == 'tree1_3'
+
+
+def test_new_version_id_fits_into_column():
+    new_id = new_version_id('abcdefghij', {'abcdefghij'})
+    assert new_id == 'abcdefgh_2'
+    assert len(new_id) == ID_LENGTH
+    used = {'abcdefghij'} | {f'abcdefgh_{n}' for n in range(2, 10)}
+    assert new_version_id('abcdefghij', used) == 'abcdefg_10'
+
+
+def test_read_trees_keeps_duplicates(tmp_path):
+    first = tree('tree1')
+    second = dict(tree('tree1'), recommendations={'node1-l': 'x'})
+    path = write_lines(tmp_path / 'trees.jsonl',
+                       [json.dumps(first), '', json.dumps(second)])
+    assert read_trees(path) == [first, second]
+
+
+def test_last_trees():
+    first = tree('tree1')
+    second = dict(tree('tree1'), recommendations={'node1-l': 'x'})
+    assert last_trees([first, tree('tree2'), second]) == \
+        ([second, tree('tree2')], 1)
+
+
+def test_version_ids_keep_every_tree():
+    trees = [tree('tree1'), tree('tree2'), tree('tree1'), tree('tree1')]
+    version_ids(trees, {'tree2'})
+    assert [tree['tree_id'] for tree in trees] == \
+        ['tree1', 'tree2_2', 'tree1_2', 'tree1_3']
+
+
+def test_read_trees_reports_bad_lines(tmp_path):
+    path = write_lines(tmp_path / 'trees.jsonl', [
+        json.dumps(tree('tree1')),
+        json.dumps(tree('a' * (ID_LENGTH + 1))),
+        'no json',
+        json.dumps({'tree_id': 'tree2'}),
+        json.dumps(tree(''))])
+    with pytest.raises(ValueError, match="lines: 2, 3, 4, 5"):
+        read_trees(path)
+
+
+def test_import_trees_unknown_conflict_mode(tmp_path):
+    path = write_lines(tmp_path / 'trees.jsonl', [json.dumps(tree('tree1'))])
+    # the mode is checked before the connection is used
+    with pytest.raises(ValueError, match="on_conflict"):
+        import_trees(None, path, on_conflict='replace')
@@ -0,0 +1,119 @@
+"""Tests for the what-if threshold sweep."""
+
+
+import json
+import pytest
+from decision_tree.data import AthleteData, data_file
+from decision_tree.what_if import ColumnIndex, WhatIf
+
+
+@pytest.fixture
+def athlete_data():
+    with open(data_file, 'r') as f:
+        return AthleteData(json.loads(f.read())['res'])
+
+
+def tree(first, second, second_test='712'):
+    """Elements of a tree with the splits 715<=first and
+    <second_test><=second."""
+    nodes = [{'data': {'id': node, 'label': ''}} for node in
+             ('everybody', 'node1-l', 'node1-r', 'node2-l', 'node2-r')]
+    edges = [{'data': {'source': source, 'target': target, 'label': label}}
+             for source, target, label in (
+                 ('everybody', 'node1-l', f'715<={first}'),
+                 ('everybody', 'node1-r', f'715>{first}'),
+                 ('node1-r', 'node2-l', f'{second_test}<={second}'),
+                 ('node1-r', 'node2-r', f'{second_test}>{second}'))]
+    return nodes + edges
+
+
+def what_if(elements, snapshot):
+    return WhatIf(elements, ColumnIndex(snapshot.table, snapshot.version))
+
+
+def test_sweep_matches_full_routing(athlete_data):
+    snapshot = athlete_data.snapshot
+    cur_what_if = what_if(tree(5, 3), snapshot)
+    for threshold in (1, 2.5, 3, 5, 7.5, 10):
+        for node, elements in (('everybody', tree(threshold, 3)),
+                               ('node1-r', tree(5, threshold))):
+            expected = what_if(elements, snapshot)
+            counts, moved = cur_what_if.sweep(node, threshold)
+            assert counts == expected.counts
+            assert {athlete for athlete, _, _ in moved} == {
+                athlete for athlete, leaf in expected.leaf_of.items() if
+                leaf != cur_what_if.leaf_of[athlete]}
+            for athlete, old_leaf, new_leaf in moved:
+                assert old_leaf == cur_what_if.leaf_of[athlete]
+                assert new_leaf == expected.leaf_of[athlete]
+
+
+def test_test_without_data(athlete_data):
+    # no athlete has a value for 799 -> nobody reaches node2-*
+    cur_what_if = what_if(tree(5, 3, '799'), athlete_data.snapshot)
+    assert cur_what_if.counts['node2-l'] == 0
+    assert cur_what_if.counts['node2-r'] == 0
+    counts, moved = cur_what_if.sweep('node1-r', 8)
+    assert counts == cur_what_if.counts
+    assert moved == []
+    assert 'node1-l' not in cur_what_if.splits
+    assert 'unknown' not in cur_what_if.splits
+
+
+def test_update_matches_full_routing(athlete_data):
+    cur_what_if = what_if(tree(5, 3), athlete_data.snapshot)
+    cur_what_if.sweep('node1-r', 3)
+    index = cur_what_if.index.updated(athlete_data.merge([
+        {"athleteID": 2991, "testID": 715, "testValue": 10,
+         "date": "2024-01-01"},
+        {"athleteID": 1, "testID": 715, "testValue": 9,
+         "date": "2024-01-01"}]))
+    # two refreshes -> both are applied at once
+    snapshot = athlete_data.merge([
+        {"athleteID": 1, "testID": 712, "testValue": 1,
+         "date": "2024-01-01"}])
+    index = index.updated(snapshot)
+    assert cur_what_if.update(index)
+    assert cur_what_if.index is index
+    expected = what_if(tree(5, 3), snapshot)
+    # new athlete 1 has a row with the values of both refreshes
+    assert index.rows.keys() == expected.index.rows.keys()
+    assert (index.rows[1]['715'], index.rows[1]['712']) == (9, 1)
+    assert cur_what_if.counts == expected.counts
+    assert cur_what_if.leaf_of == expected.leaf_of
+    assert cur_what_if.members == expected.members
+    for threshold in (1, 4, 6, 9):
+        assert cur_what_if.sweep('node1-r', threshold) == \
+            expected.sweep('node1-r', threshold)
+        assert cur_what_if.sweep('everybody', threshold) == \
+            expected.sweep('everybody', threshold)
+
+
+def test_index_is_shared_and_not_changed(athlete_data):
+    index = ColumnIndex(athlete_data.snapshot.table)
+    first = WhatIf(tree(5, 3), index)
+    second = WhatIf(tree(4, 2), index)
+    first.sweep('everybody', 5)
+    first.sweep('node1-r', 3)
+    assert second.index.rows is first.index.rows
+    new_index = index.updated(athlete_data.merge([
+        {"athleteID": 2991, "testID": 712, "testValue": 1,
+         "date": "2024-01-01"}]))
+    # only the sorted values of the changed test are dropped
+    assert set(new_index.columns) == {'715'}
+    # the old index is still the old data for the WhatIfs that use it
+    assert set(index.columns) == {'715', '712'}
+    assert index.rows[2991]['712'] == 8
+    assert new_index.rows[2991]['712'] != 8
+
+
+def test_missed_snapshot_is_not_applied(athlete_data):
+    cur_what_if = what_if(tree(5, 3), athlete_data.snapshot)
+    athlete_data.merge([{"athleteID": 2991, "testID": 712, "testValue": 1,
+                         "date": "2024-01-01"}])
+    snapshot = athlete_data.merge([{"athleteID": 2991, "testID": 715,
+                                    "testValue": 1, "date": "2024-01-01"}])
+    # index created from the table -> the changes are not known
+    assert not cur_what_if.update(ColumnIndex(snapshot.table,
+                                              snapshot.version))
+    assert cur_what_if.index.version == 0
@@ -0,0 +1,51 @@
+"""Bulk Export and Import of stored Trees.
+
+Export all (or selected) trees of the table "store" to a file with one JSON
+object per line:
+    python3 tree_transfer.py export trees.jsonl [--ids tree1 tree2]
+Import the trees of such a file into the table "store":
+    python3 tree_transfer.py import trees.jsonl [--on-conflict skip]
+"""
+
+
+import argparse
+from decision_tree import storage
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bulk export/import of the trees in the table store")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    export_parser = subparsers.add_parser(
+        'export', help="Write trees to a file (one JSON object per line)")
+    export_parser.add_argument('path')
+    export_parser.add_argument('--ids', nargs='+',
+                               help="Only export these tree ids")
+    import_parser = subparsers.add_parser(
+        'import', help="Store the trees of an exported file")
+    import_parser.add_argument('path')
+    import_parser.add_argument('--on-conflict', choices=storage.CONFLICT_MODES,
+                               default='skip',
+                               help="What to do if a tree id exists already")
+    args = parser.parse_args()
+
+    conn = storage.get_connection()
+    if args.command == 'export':
+        number = storage.export_trees(conn, args.path, args.ids)
+        print(f"{number} trees exported to {args.path}")
+    else:
+        try:
+            number, superseded = storage.import_trees(conn, args.path,
+                                                      args.on_conflict)
+        except ValueError as error:
+            conn.close()
+            parser.error(str(error))
+        print(f"{number} trees imported from {args.path}")
+        if superseded:
+            print(f"{superseded} trees not imported: a later tree in the "
+                  f"file has the same tree_id")
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()